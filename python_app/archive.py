@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).resolve().parent / "audio_archive"
+HOUR_FORMAT = "%Y%m%d%H"
+CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArchiveConfig:
+    enabled: bool
+    root: Path
+    bitrate: str
+    retention_hours: int
+
+    @staticmethod
+    def from_env() -> "ArchiveConfig":
+        return ArchiveConfig(
+            enabled=os.getenv("AUDIO_ARCHIVE_ENABLED", "true").lower() == "true",
+            root=Path(os.getenv("AUDIO_ARCHIVE_DIR", str(DEFAULT_ARCHIVE_DIR))),
+            bitrate=os.getenv("AUDIO_ARCHIVE_BITRATE", "16k"),
+            retention_hours=int(os.getenv("AUDIO_ARCHIVE_RETENTION_HOURS", "72")),
+        )
+
+
+@dataclass(frozen=True)
+class ClipLocation:
+    path: str
+    offset: int
+    length: int
+
+
+class ClipArchive:
+    """Opus clips appended to one file per stream per hour.
+
+    Every clip is a complete Ogg Opus stream, so the bytes at ``offset`` for
+    ``length`` in an hour file can be served on their own as a playable file.
+    """
+
+    def __init__(self, config: ArchiveConfig) -> None:
+        self._config = config
+        self._last_pruned_hour: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def store(self, ffmpeg_bin: str, stream_id: int, segment_path: Path) -> ClipLocation | None:
+        data = self._encode(ffmpeg_bin, segment_path)
+        if not data:
+            return None
+
+        hour = datetime.utcnow().strftime(HOUR_FORMAT)
+        relative = Path(str(stream_id)) / f"{hour}.ogg"
+        target = self._config.root / relative
+        # Archiving is best effort: a full disk or bad permissions must never
+        # cost the transcript or stop the monitor.
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with target.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(data)
+        except OSError:
+            logger.exception("Failed to archive clip for stream %s", stream_id)
+            return None
+
+        if hour != self._last_pruned_hour:
+            self._last_pruned_hour = hour
+            self.prune()
+        return ClipLocation(path=relative.as_posix(), offset=offset, length=len(data))
+
+    def has_clip(self, relative: str | None) -> bool:
+        """Whether a stored clip is still inside the retention window."""
+        return relative is not None and Path(relative).stem >= self._cutoff()
+
+    def prune(self) -> None:
+        """Delete hour files older than the retention window."""
+        cutoff = self._cutoff()
+        try:
+            for hour_file in self._config.root.glob("*/*.ogg"):
+                if hour_file.stem < cutoff:
+                    hour_file.unlink(missing_ok=True)
+        except OSError:
+            logger.exception("Failed to prune audio archive")
+
+    def _cutoff(self) -> str:
+        return (datetime.utcnow() - timedelta(hours=self._config.retention_hours)).strftime(HOUR_FORMAT)
+
+    def remove_stream(self, stream_id: int) -> None:
+        shutil.rmtree(self._config.root / str(stream_id), ignore_errors=True)
+
+    def resolve(self, relative: str) -> Path | None:
+        root = self._config.root.resolve()
+        path = (root / relative).resolve()
+        if not path.is_relative_to(root) or not path.is_file():
+            return None
+        return path
+
+    def _encode(self, ffmpeg_bin: str, segment_path: Path) -> bytes | None:
+        cmd = [
+            ffmpeg_bin,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            str(segment_path),
+            "-c:a",
+            "libopus",
+            "-b:a",
+            self._config.bitrate,
+            "-application",
+            "voip",
+            "-f",
+            "ogg",
+            "pipe:1",
+        ]
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True)
+        except Exception:
+            return None
+        return result.stdout
+
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes ``start`` to ``end`` (inclusive) of ``path`` through an mmap."""
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = start
+        while position <= end:
+            stop = min(position + CHUNK_SIZE, end + 1)
+            yield mapped[position:stop]
+            position = stop
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into inclusive offsets.
+
+    Returns None when the whole resource should be sent and raises ValueError
+    for ranges that cannot be satisfied.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise ValueError(header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(header) from None
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
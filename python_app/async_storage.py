@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from sqlalchemy import delete, desc, select, update
+
+from .db import Base, create_async_session_factory, upgrade_schema
+from .models import ActivityRollup, Stream, Transcription
+from .rollups import activity_query, increment_statement, rollup_counts
+from .schemas import StreamCreate, TranscriptionCreate
+
+
+_engine = None
+_session_factory = None
+
+
+def configure(url: str | None = None) -> None:
+    global _engine, _session_factory
+    if url is None:
+        _engine, _session_factory = create_async_session_factory()
+    else:
+        _engine, _session_factory = create_async_session_factory(url)
+
+
+@asynccontextmanager
+async def session_scope():
+    if _session_factory is None:
+        configure()
+    session = _session_factory()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def init_models() -> None:
+    if _engine is None:
+        configure()
+    async with _engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+
+
+async def dispose() -> None:
+    if _engine is not None:
+        await _engine.dispose()
+
+
+async def get_streams() -> list[Stream]:
+    async with session_scope() as session:
+        result = await session.execute(select(Stream).order_by(desc(Stream.created_at)))
+        streams = list(result.scalars())
+        for stream in streams:
+            session.expunge(stream)
+        return streams
+
+
+async def get_stream(stream_id: int) -> Stream | None:
+    async with session_scope() as session:
+        stream = await session.get(Stream, stream_id)
+        if stream:
+            session.expunge(stream)
+        return stream
+
+
+async def create_stream(payload: StreamCreate) -> Stream:
+    async with session_scope() as session:
+        stream = Stream(**payload.model_dump(mode="json"))
+        session.add(stream)
+        await session.flush()
+        await session.refresh(stream)
+        session.expunge(stream)
+        return stream
+
+
+async def update_stream_status(stream_id: int, status: str) -> Stream | None:
+    async with session_scope() as session:
+        await session.execute(
+            update(Stream).where(Stream.id == stream_id).values(status=status)
+        )
+        await session.flush()
+        stream = await session.get(Stream, stream_id)
+        if stream:
+            session.expunge(stream)
+        return stream
+
+
+async def delete_stream(stream_id: int) -> None:
+    async with session_scope() as session:
+        await session.execute(
+            delete(Transcription).where(Transcription.stream_id == stream_id)
+        )
+        await session.execute(
+            delete(ActivityRollup).where(ActivityRollup.stream_id == stream_id)
+        )
+        stream = await session.get(Stream, stream_id)
+        if stream:
+            await session.delete(stream)
+
+
+async def get_transcriptions(stream_id: int, limit: int = 50) -> list[Transcription]:
+    async with session_scope() as session:
+        result = await session.execute(
+            select(Transcription)
+            .where(Transcription.stream_id == stream_id)
+            .order_by(desc(Transcription.timestamp))
+            .limit(limit)
+        )
+        items = list(result.scalars())
+        for item in items:
+            session.expunge(item)
+        return items
+
+
+async def get_transcription(transcription_id: int) -> Transcription | None:
+    async with session_scope() as session:
+        transcription = await session.get(Transcription, transcription_id)
+        if transcription:
+            session.expunge(transcription)
+        return transcription
+
+
+async def get_all_transcriptions(limit: int = 100, with_location: bool = False) -> list[Transcription]:
+    async with session_scope() as session:
+        query = select(Transcription).order_by(desc(Transcription.timestamp)).limit(limit)
+        if with_location:
+            query = query.where(
+                Transcription.latitude.is_not(None),
+                Transcription.longitude.is_not(None),
+            )
+        result = await session.execute(query)
+        items = list(result.scalars())
+        for item in items:
+            session.expunge(item)
+        return items
+
+
+async def create_transcription(payload: TranscriptionCreate) -> Transcription:
+    async with session_scope() as session:
+        transcription = Transcription(**payload.model_dump())
+        session.add(transcription)
+        await session.flush()
+        await session.refresh(transcription)
+        stream = await session.get(Stream, transcription.stream_id)
+        category = stream.category if stream else None
+        counts = rollup_counts(
+            [(transcription.timestamp, transcription.stream_id, category, transcription.call_type)]
+        )
+        await session.execute(increment_statement(session.get_bind().dialect.name, counts))
+        session.expunge(transcription)
+        return transcription
+
+
+async def get_activity(
+    granularity: str,
+    since: datetime | None = None,
+    group_by: str | None = None,
+    stream_id: int | None = None,
+    category: str | None = None,
+) -> list[tuple]:
+    async with session_scope() as session:
+        result = await session.execute(
+            activity_query(granularity, since, group_by, stream_id, category)
+        )
+        return [tuple(row) for row in result]
@@ -0,0 +1,127 @@
+"""Compare request latency of the threaded and native asyncio storage backends.
+
+Simulated monitors hold default-executor threads the way ffmpeg/whisper waits
+do and insert a transcription per segment, while simulated HTTP clients read
+the latest transcriptions for a stream. Run with::
+
+    python -m python_app.bench_storage --monitors 40 --clients 20 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(name: str, samples: list[float]) -> str:
+    ms = [value * 1000 for value in samples]
+    mean = statistics.fmean(ms) if ms else 0.0
+    return (
+        f"  {name:<7} n={len(ms):<6} mean={mean:7.2f}ms p50={_percentile(ms, 50):7.2f}ms "
+        f"p95={_percentile(ms, 95):7.2f}ms p99={_percentile(ms, 99):7.2f}ms max={max(ms, default=0):7.2f}ms"
+    )
+
+
+async def _run_backend(backend: str, url: str, args: argparse.Namespace) -> None:
+    from sqlalchemy import create_engine
+
+    from . import async_storage, storage
+    from .db import Base
+    from .schemas import StreamCreate, TranscriptionCreate
+
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    sync_engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.create_all(sync_engine)
+    storage.SessionLocal.configure(bind=sync_engine)
+
+    if backend == "async":
+        async_storage.configure(url)
+        create_stream = async_storage.create_stream
+        create_transcription = async_storage.create_transcription
+        get_transcriptions = async_storage.get_transcriptions
+    else:
+
+        async def create_stream(payload):
+            return await asyncio.to_thread(storage.create_stream, payload)
+
+        async def create_transcription(payload):
+            return await asyncio.to_thread(storage.create_transcription, payload)
+
+        async def get_transcriptions(stream_id, limit=50):
+            return await asyncio.to_thread(storage.get_transcriptions, stream_id, limit)
+
+    stream_ids = []
+    for index in range(args.streams):
+        stream = await create_stream(
+            StreamCreate(name=f"Bench {index}", url="https://example.com/stream")
+        )
+        stream_ids.append(stream.id)
+
+    reads: list[float] = []
+    writes: list[float] = []
+    deadline = time.monotonic() + args.duration
+
+    async def monitor(stream_id: int) -> None:
+        while time.monotonic() < deadline:
+            # Stand-in for the blocking capture/transcribe subprocess waits.
+            await asyncio.to_thread(time.sleep, args.segment_wait)
+            started = time.perf_counter()
+            await create_transcription(
+                TranscriptionCreate(stream_id=stream_id, content="Engine 5 respond to 100 Main St")
+            )
+            writes.append(time.perf_counter() - started)
+
+    async def client() -> None:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await get_transcriptions(random.choice(stream_ids), 50)
+            reads.append(time.perf_counter() - started)
+            await asyncio.sleep(args.client_interval)
+
+    await asyncio.gather(
+        *(monitor(stream_ids[index % len(stream_ids)]) for index in range(args.monitors)),
+        *(client() for _ in range(args.clients)),
+    )
+    if backend == "async":
+        await async_storage.dispose()
+    sync_engine.dispose()
+
+    print(f"{backend}:")
+    print(_summarize("reads", reads))
+    print(_summarize("writes", writes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["thread", "async", "both"], default="both")
+    parser.add_argument("--database-url", help="Defaults to a fresh temporary SQLite file per backend")
+    parser.add_argument("--monitors", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--streams", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--segment-wait", type=float, default=0.5)
+    parser.add_argument("--client-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    backends = ["thread", "async"] if args.backend == "both" else [args.backend]
+    with tempfile.TemporaryDirectory(prefix="bench_storage_") as tempdir:
+        for backend in backends:
+            url = args.database_url or f"sqlite:///{Path(tempdir) / f'{backend}.db'}"
+            asyncio.run(_run_backend(backend, url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+import wave
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .models import Transcription
+
+
+FRAME_SIZE = 2048
+HOP_SIZE = 128
+BAND_EDGES = np.geomspace(300.0, 3000.0, 34)
+MIN_VOICED_FRAMES = 64
+SILENCE_RMS = 10 ** (-45 / 20)
+MINHASH_PERMUTATIONS = 64
+MINHASH_PRIME = (1 << 61) - 1
+
+_rng = np.random.default_rng(0x5EED)
+_MINHASH_A = _rng.integers(1, 1 << 31, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = _rng.integers(0, 1 << 31, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+@dataclass(frozen=True)
+class DedupConfig:
+    enabled: bool
+    window_seconds: float
+    action: str
+    audio_max_bit_error: float
+    audio_min_overlap: float
+    text_threshold: float
+    text_min_shingles: int
+    wait_seconds: float
+
+    @staticmethod
+    def from_env() -> "DedupConfig":
+        return DedupConfig(
+            enabled=os.getenv("DEDUP_ENABLED", "true").lower() == "true",
+            window_seconds=float(os.getenv("DEDUP_WINDOW_SECONDS", "120")),
+            action=os.getenv("DEDUP_ACTION", "link").lower(),
+            audio_max_bit_error=float(os.getenv("DEDUP_AUDIO_MAX_BIT_ERROR", "0.3")),
+            audio_min_overlap=float(os.getenv("DEDUP_AUDIO_MIN_OVERLAP", "0.8")),
+            text_threshold=float(os.getenv("DEDUP_TEXT_THRESHOLD", "0.8")),
+            text_min_shingles=int(os.getenv("DEDUP_TEXT_MIN_SHINGLES", "6")),
+            wait_seconds=float(os.getenv("DEDUP_WAIT_SECONDS", "60")),
+        )
+
+
+@dataclass
+class AudioFingerprint:
+    """32-bit spectral sub-fingerprints, one per frame, with a voiced-frame mask.
+
+    ``sorted_hashes``/``sorted_positions`` hold the voiced frames ordered by
+    hash for vectorised lookups.
+    """
+
+    hashes: np.ndarray
+    voiced: np.ndarray
+    sorted_hashes: np.ndarray
+    sorted_positions: np.ndarray
+
+    @property
+    def voiced_frames(self) -> int:
+        return int(self.voiced.sum())
+
+
+@dataclass
+class _AudioEntry:
+    serial: int
+    stream_id: int
+    created_at: float
+    fingerprint: AudioFingerprint
+    result: asyncio.Future
+
+
+@dataclass
+class _TextEntry:
+    stream_id: int
+    created_at: float
+    signature: np.ndarray
+    transcription: Transcription
+
+
+def fingerprint_wav(path: Path) -> AudioFingerprint | None:
+    """Compute spectral hashes for a mono 16-bit WAV, or None if it is mostly silence."""
+    try:
+        with wave.open(str(path), "rb") as reader:
+            rate = reader.getframerate()
+            if reader.getsampwidth() != 2 or reader.getnchannels() != 1:
+                return None
+            samples = np.frombuffer(reader.readframes(reader.getnframes()), dtype="<i2")
+    except (OSError, wave.Error, EOFError):
+        return None
+    if samples.size < FRAME_SIZE * 2:
+        return None
+
+    audio = samples.astype(np.float32) / 32768.0
+    frames = np.lib.stride_tricks.sliding_window_view(audio, FRAME_SIZE)[::HOP_SIZE]
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1)) ** 2
+
+    bins = np.fft.rfftfreq(FRAME_SIZE, 1.0 / rate)
+    band_index = np.searchsorted(BAND_EDGES, bins, side="right") - 1
+    bands = np.arange(len(BAND_EDGES) - 1)
+    energies = spectrum @ (band_index[:, None] == bands[None, :]).astype(np.float32)
+
+    # Haitsma-Kalker bits: sign of the band-energy difference, differenced in time.
+    band_diff = energies[:, :-1] - energies[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    hashes = np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel()
+    voiced = rms[1:] > SILENCE_RMS
+    if voiced.sum() < MIN_VOICED_FRAMES:
+        return None
+
+    positions = np.flatnonzero(voiced)
+    order = np.argsort(hashes[positions], kind="stable")
+    return AudioFingerprint(
+        hashes=hashes,
+        voiced=voiced,
+        sorted_hashes=hashes[positions][order],
+        sorted_positions=positions[order],
+    )
+
+
+def text_signature(text: str, min_shingles: int = 1) -> np.ndarray | None:
+    """MinHash signature over word 3-gram shingles.
+
+    Returns None for transcripts with fewer than ``min_shingles`` distinct
+    shingles; short stock phrases ("Copy that.") are too common to compare.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    shingles = {" ".join(words[i : i + 3]) for i in range(len(words) - 2)}
+    if not shingles or len(shingles) < min_shingles:
+        return None
+    values = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    hashed = (np.outer(_MINHASH_A, values) + _MINHASH_B[:, None]) % MINHASH_PRIME
+    return hashed.min(axis=1)
+
+
+class SegmentDeduplicator:
+    """Recent audio and transcripts across all streams, for simulcast detection."""
+
+    def __init__(self, config: DedupConfig) -> None:
+        self._config = config
+        self._audio: deque[_AudioEntry] = deque()
+        self._audio_serial = 0
+        self._texts: deque[_TextEntry] = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    @property
+    def suppress(self) -> bool:
+        return self._config.action == "suppress"
+
+    async def match_audio(self, stream_id: int, fingerprint: AudioFingerprint) -> asyncio.Future | None:
+        """Find a segment another stream captured recently with the same audio.
+
+        Returns a future resolving to that segment's transcription (or None
+        when it produced no usable text), which may still be pending if the
+        other monitor is transcribing right now. Comparisons run in a worker
+        thread; segments registered meanwhile are checked in a further round,
+        and the final empty round returns without awaiting so the caller can
+        ``register_audio`` atomically.
+        """
+        self._prune()
+        checked = 0
+        while True:
+            candidates = [
+                entry
+                for entry in self._audio
+                if entry.serial > checked and entry.stream_id != stream_id
+            ]
+            if not candidates:
+                return None
+            checked = self._audio_serial
+            entry = await asyncio.to_thread(self._find_audio_match, fingerprint, candidates)
+            if entry is not None:
+                return entry.result
+
+    def register_audio(self, stream_id: int, fingerprint: AudioFingerprint) -> asyncio.Future:
+        result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._audio_serial += 1
+        self._audio.append(
+            _AudioEntry(self._audio_serial, stream_id, time.monotonic(), fingerprint, result)
+        )
+        return result
+
+    def text_signature(self, text: str) -> np.ndarray | None:
+        return text_signature(text, self._config.text_min_shingles)
+
+    def match_text(self, stream_id: int, signature: np.ndarray) -> Transcription | None:
+        self._prune()
+        for entry in reversed(self._texts):
+            if entry.stream_id == stream_id:
+                continue
+            similarity = float(np.mean(entry.signature == signature))
+            if similarity >= self._config.text_threshold:
+                return entry.transcription
+        return None
+
+    def register_text(self, signature: np.ndarray, transcription: Transcription) -> None:
+        self._texts.append(
+            _TextEntry(transcription.stream_id, time.monotonic(), signature, transcription)
+        )
+
+    def _find_audio_match(
+        self, probe: AudioFingerprint, candidates: list[_AudioEntry]
+    ) -> _AudioEntry | None:
+        for entry in reversed(candidates):
+            if self._audio_matches(probe, entry.fingerprint):
+                return entry
+        return None
+
+    def _audio_matches(self, probe: AudioFingerprint, candidate: AudioFingerprint) -> bool:
+        # Vote for alignments using exactly matching sub-fingerprints, then
+        # verify the best few by bit error rate over the overlapping frames.
+        left = np.searchsorted(candidate.sorted_hashes, probe.sorted_hashes, side="left")
+        right = np.searchsorted(candidate.sorted_hashes, probe.sorted_hashes, side="right")
+        hits = right - left
+        total = int(hits.sum())
+        if total == 0:
+            return False
+        # Expand each probe frame into one row per equal-hash candidate frame.
+        starts = np.repeat(left - (np.cumsum(hits) - hits), hits)
+        matched = candidate.sorted_positions[np.arange(total) + starts]
+        offsets = matched - np.repeat(probe.sorted_positions, hits)
+        values, votes = np.unique(offsets, return_counts=True)
+        for offset in values[np.argsort(votes)[::-1][:3]].tolist():
+            start = max(0, -offset)
+            stop = min(len(probe.hashes), len(candidate.hashes) - offset)
+            if stop <= start:
+                continue
+            mask = probe.voiced[start:stop] & candidate.voiced[start + offset : stop + offset]
+            overlap = int(mask.sum())
+            if overlap < self._config.audio_min_overlap * probe.voiced_frames:
+                continue
+            diff = probe.hashes[start:stop][mask] ^ candidate.hashes[start + offset : stop + offset][mask]
+            errors = int(np.unpackbits(diff.view(np.uint8)).sum())
+            if errors / (overlap * 32) <= self._config.audio_max_bit_error:
+                return True
+        return False
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self._config.window_seconds
+        while self._audio and self._audio[0].created_at < cutoff:
+            entry = self._audio.popleft()
+            if not entry.result.done():
+                entry.result.set_result(None)
+        while self._texts and self._texts[0].created_at < cutoff:
+            self._texts.popleft()
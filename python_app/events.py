@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+
+from .models import Transcription
+
+
+@dataclass(frozen=True)
+class EventBufferConfig:
+    capacity: int
+    per_stream_capacity: int
+
+    @staticmethod
+    def from_env() -> "EventBufferConfig":
+        return EventBufferConfig(
+            capacity=int(os.getenv("EVENT_BUFFER_SIZE", "2000")),
+            per_stream_capacity=int(os.getenv("EVENT_BUFFER_PER_STREAM", "500")),
+        )
+
+
+def transcription_event(epoch: str, sequence: int, transcription: Transcription, has_audio: bool) -> dict:
+    return {
+        "type": "transcription",
+        "epoch": epoch,
+        "id": sequence,
+        "payload": {
+            "id": transcription.id,
+            "streamId": transcription.stream_id,
+            "content": transcription.content,
+            "timestamp": transcription.timestamp.isoformat(),
+            "latitude": transcription.latitude,
+            "longitude": transcription.longitude,
+            "address": transcription.address,
+            "callType": transcription.call_type,
+            "duplicateOf": transcription.duplicate_of,
+            "hasAudio": has_audio,
+        },
+    }
+
+
+class TranscriptionBuffer:
+    """Bounded in-memory history of recent transcriptions.
+
+    Published events get a sequence number in publish order, which clients use
+    as their resume cursor. Sequence numbers restart with the process, so each
+    buffer has a random epoch and a cursor from another epoch forces a resync.
+    """
+
+    def __init__(self, config: EventBufferConfig) -> None:
+        self._config = config
+        self.epoch = secrets.token_hex(8)
+        self._sequence = 0
+        self._events: deque[tuple[int, Transcription]] = deque()
+        self._by_stream: dict[int, deque[Transcription]] = {}
+        # Events with a sequence number at or below the floor were evicted.
+        self._floor = 0
+
+    @property
+    def last_sequence(self) -> int:
+        return self._sequence
+
+    def prime(self, by_stream: dict[int, list[Transcription]]) -> None:
+        """Load per-stream history from the database."""
+        for stream_id, items in by_stream.items():
+            items = sorted(items, key=lambda item: item.id)
+            self._by_stream[stream_id] = deque(items[-self._config.per_stream_capacity :])
+
+    def discard_stream(self, stream_id: int) -> None:
+        self._by_stream.pop(stream_id, None)
+        self._events = deque(event for event in self._events if event[1].stream_id != stream_id)
+
+    def append(self, transcription: Transcription) -> int:
+        self._sequence += 1
+        if len(self._events) >= self._config.capacity:
+            self._floor = self._events.popleft()[0]
+        self._events.append((self._sequence, transcription))
+
+        items = self._by_stream.setdefault(transcription.stream_id, deque())
+        if len(items) >= self._config.per_stream_capacity:
+            items.popleft()
+        items.append(transcription)
+        return self._sequence
+
+    def since(self, epoch: str | None, sequence: int) -> list[tuple[int, Transcription]] | None:
+        """Events after ``sequence``, or None if the cursor cannot be resumed."""
+        if epoch != self.epoch or sequence < self._floor or sequence > self._sequence:
+            return None
+        return [event for event in self._events if event[0] > sequence]
+
+    def latest(self, stream_id: int, limit: int) -> list[Transcription] | None:
+        """Newest-first ``limit`` items for a stream, or None if the buffer holds fewer.
+
+        Short answers go to the database, which also sees rows written by other
+        processes; a full buffer only reflects what this process published.
+        """
+        items = self._by_stream.get(stream_id)
+        if items is None or len(items) < limit:
+            return None
+        return list(islice(reversed(items), limit))
@@ -1,25 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+from datetime import datetime
 from pathlib import Path
+from typing import Literal
 
 from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from .db import Base, engine
+from . import store
+from .archive import ArchiveConfig, ClipArchive, iter_file_range, parse_range
+from .events import EventBufferConfig, TranscriptionBuffer
+from .models import Stream
 from .monitor import MonitorManager
-from .schemas import StreamCreate, StreamOut, StreamStatusUpdate, TranscriptionOut
-from .storage import (
-    create_stream,
-    delete_stream,
-    get_all_transcriptions,
-    get_stream,
-    get_streams,
-    get_transcriptions,
-    update_stream_status,
-)
+from .schemas import ActivityBucketOut, StreamCreate, StreamOut, StreamStatusUpdate, TranscriptionOut
 from .websockets import WebSocketManager
 
 
@@ -29,22 +25,30 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 app = FastAPI(title="Audio Stream Monitor (Python)")
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
 
-websocket_manager = WebSocketManager()
-monitor_manager = MonitorManager(websocket_manager)
+event_buffer_config = EventBufferConfig.from_env()
+transcription_buffer = TranscriptionBuffer(event_buffer_config)
+clip_archive = ClipArchive(ArchiveConfig.from_env())
+websocket_manager = WebSocketManager(transcription_buffer, clip_archive)
+monitor_manager = MonitorManager(websocket_manager, clip_archive)
 
 
 @app.on_event("startup")
 async def startup() -> None:
-    Base.metadata.create_all(engine)
-    seeded_ids = await asyncio.to_thread(_seed_streams)
-    if seeded_ids:
-        for stream_id in seeded_ids:
-            monitor_manager.start(stream_id)
+    await store.init_models()
+    seeded = await _seed_streams()
+    await _prime_transcription_buffer()
+    # Monitors ramp up in the background so the server is ready immediately.
+    monitor_manager.schedule(seeded)
     await _resume_monitors()
 
 
-def _seed_streams() -> list[int]:
-    streams = get_streams()
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await store.dispose()
+
+
+async def _seed_streams() -> list[Stream]:
+    streams = await store.get_streams()
     if streams:
         return []
 
@@ -96,25 +100,31 @@ def _seed_streams() -> list[int]:
         },
     ]
 
-    started_ids: list[int] = []
+    started: list[Stream] = []
     for seed in seed_streams:
-        stream = create_stream(StreamCreate(**seed))
+        stream = await store.create_stream(StreamCreate(**seed))
         if seed["name"] not in {"LA Fire Department"}:
-            started_ids.append(stream.id)
+            started.append(stream)
+
+    return started
 
-    return started_ids
+
+async def _prime_transcription_buffer() -> None:
+    by_stream = {
+        stream.id: await store.get_transcriptions(stream.id, event_buffer_config.per_stream_capacity)
+        for stream in await store.get_streams()
+    }
+    transcription_buffer.prime(by_stream)
 
 
 async def _resume_monitors() -> None:
-    streams = await asyncio.to_thread(get_streams)
-    for stream in streams:
-        if stream.status == "active":
-            monitor_manager.start(stream.id)
+    streams = await store.get_streams()
+    monitor_manager.schedule(stream for stream in streams if stream.status == "active")
 
 
 @app.get("/", response_class=HTMLResponse)
-def dashboard(request: Request) -> HTMLResponse:
-    streams = get_streams()
+async def dashboard(request: Request) -> HTMLResponse:
+    streams = await store.get_streams()
     return templates.TemplateResponse(
         "dashboard.html",
         {"request": request, "streams": streams, "page": "dashboard"},
@@ -122,8 +132,8 @@ def dashboard(request: Request) -> HTMLResponse:
 
 
 @app.get("/streams/{stream_id}", response_class=HTMLResponse)
-def stream_detail(request: Request, stream_id: int) -> HTMLResponse:
-    stream = get_stream(stream_id)
+async def stream_detail(request: Request, stream_id: int) -> HTMLResponse:
+    stream = await store.get_stream(stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
     return templates.TemplateResponse(
@@ -140,14 +150,19 @@ def map_view(request: Request) -> HTMLResponse:
     )
 
 
+@app.get("/api/health")
+async def api_health() -> dict:
+    return {"status": "ok", "monitors": monitor_manager.status()}
+
+
 @app.get("/api/streams", response_model=list[StreamOut])
-def api_list_streams() -> list[StreamOut]:
-    return [StreamOut.model_validate(stream) for stream in get_streams()]
+async def api_list_streams() -> list[StreamOut]:
+    return [StreamOut.model_validate(stream) for stream in await store.get_streams()]
 
 
 @app.get("/api/streams/{stream_id}", response_model=StreamOut)
-def api_get_stream(stream_id: int) -> StreamOut:
-    stream = get_stream(stream_id)
+async def api_get_stream(stream_id: int) -> StreamOut:
+    stream = await store.get_stream(stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
     return StreamOut.model_validate(stream)
@@ -155,62 +170,126 @@ def api_get_stream(stream_id: int) -> StreamOut:
 
 @app.post("/api/streams", response_model=StreamOut, status_code=201)
 async def api_create_stream(payload: StreamCreate) -> StreamOut:
-    stream = await asyncio.to_thread(create_stream, payload)
-    monitor_manager.start(stream.id)
+    stream = await store.create_stream(payload)
+    await monitor_manager.start(stream.id)
     return StreamOut.model_validate(stream)
 
 
 @app.patch("/api/streams/{stream_id}/status", response_model=StreamOut)
 async def api_update_stream_status(stream_id: int, payload: StreamStatusUpdate) -> StreamOut:
-    stream = await asyncio.to_thread(get_stream, stream_id)
+    stream = await store.get_stream(stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
 
-    updated = await asyncio.to_thread(update_stream_status, stream_id, payload.status)
+    updated = await store.update_stream_status(stream_id, payload.status)
     if payload.status == "active":
-        monitor_manager.start(stream_id)
+        await monitor_manager.start(stream_id)
     else:
-        monitor_manager.stop(stream_id)
+        await monitor_manager.stop(stream_id)
 
     return StreamOut.model_validate(updated)
 
 
 @app.delete("/api/streams/{stream_id}", status_code=204)
 async def api_delete_stream(stream_id: int) -> Response:
-    stream = await asyncio.to_thread(get_stream, stream_id)
+    stream = await store.get_stream(stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
-    monitor_manager.stop(stream_id)
-    await asyncio.to_thread(delete_stream, stream_id)
+    await monitor_manager.stop(stream_id)
+    await store.delete_stream(stream_id)
+    transcription_buffer.discard_stream(stream_id)
+    await asyncio.to_thread(clip_archive.remove_stream, stream_id)
     return Response(status_code=204)
 
 
 @app.get("/api/streams/{stream_id}/transcriptions", response_model=list[TranscriptionOut])
-def api_stream_transcriptions(
+async def api_stream_transcriptions(
     stream_id: int,
     limit: int = Query(50, ge=1, le=500),
 ) -> list[TranscriptionOut]:
-    return [
-        TranscriptionOut.model_validate(item)
-        for item in get_transcriptions(stream_id, limit)
-    ]
+    items = transcription_buffer.latest(stream_id, limit)
+    if items is None:
+        items = await store.get_transcriptions(stream_id, limit)
+    return [_transcription_out(item) for item in items]
 
 
 @app.get("/api/transcriptions", response_model=list[TranscriptionOut])
-def api_all_transcriptions(
+async def api_all_transcriptions(
     limit: int = Query(100, ge=1, le=500),
     withLocation: bool = Query(False),
 ) -> list[TranscriptionOut]:
+    items = await store.get_all_transcriptions(limit=limit, with_location=withLocation)
+    return [_transcription_out(item) for item in items]
+
+
+def _transcription_out(item) -> TranscriptionOut:
+    out = TranscriptionOut.model_validate(item)
+    out.has_audio = clip_archive.has_clip(item.audio_path)
+    return out
+
+
+@app.get("/api/transcriptions/{transcription_id}/audio")
+async def api_transcription_audio(request: Request, transcription_id: int) -> Response:
+    transcription = await store.get_transcription(transcription_id)
+    if not transcription or not clip_archive.has_clip(transcription.audio_path):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path = clip_archive.resolve(transcription.audio_path)
+    clip_start = transcription.audio_offset or 0
+    size = transcription.audio_length or 0
+    if path is None or path.stat().st_size < clip_start + size:
+        raise HTTPException(status_code=404, detail="Audio no longer available")
+
+    headers = {"Accept-Ranges": "bytes"}
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(path, clip_start + start, clip_start + end),
+        status_code=status_code,
+        media_type="audio/ogg",
+        headers=headers,
+    )
+
+
+@app.get("/api/stats/activity", response_model=list[ActivityBucketOut])
+async def api_activity_stats(
+    granularity: Literal["minute", "hour", "day"] = Query("hour"),
+    since: datetime | None = Query(None),
+    groupBy: Literal["stream", "category", "callType"] | None = Query(None),
+    streamId: int | None = Query(None),
+    category: str | None = Query(None),
+) -> list[ActivityBucketOut]:
+    rows = await store.get_activity(
+        granularity,
+        since=since,
+        group_by=groupBy,
+        stream_id=streamId,
+        category=category,
+    )
     return [
-        TranscriptionOut.model_validate(item)
-        for item in get_all_transcriptions(limit=limit, with_location=withLocation)
+        ActivityBucketOut(bucket=row[0], key=row[1] if groupBy else None, count=row[-1])
+        for row in rows
     ]
 
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket) -> None:
-    await websocket_manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    since: int | None = Query(None, ge=0),
+    epoch: str | None = Query(None),
+) -> None:
     try:
+        await websocket_manager.connect(websocket, epoch, since)
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
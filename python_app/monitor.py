@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
+import logging
 import os
 import re
 import shutil
@@ -10,15 +12,21 @@ import tempfile
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable, Iterable
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
-from . import storage
+from . import store
+from .archive import ClipArchive, ClipLocation
+from .dedup import DedupConfig, SegmentDeduplicator, fingerprint_wav
+from .models import Stream, Transcription
 from .schemas import TranscriptionCreate
 from .websockets import WebSocketManager
 
 
+logger = logging.getLogger(__name__)
+
+
 @dataclass(frozen=True)
 class TranscriberConfig:
     whisper_bin: Path
@@ -54,6 +62,64 @@ class TranscriberConfig:
         )
 
 
+@dataclass(frozen=True)
+class StartupConfig:
+    start_interval: float
+    category_priority: tuple[str, ...]
+
+    @staticmethod
+    def from_env() -> "StartupConfig":
+        priority = os.getenv("MONITOR_START_PRIORITY", "Fire,EMS,Medical,Police,Weather")
+        return StartupConfig(
+            start_interval=float(os.getenv("MONITOR_START_INTERVAL", "2.0")),
+            category_priority=tuple(item.strip() for item in priority.split(",") if item.strip()),
+        )
+
+
+class StartupScheduler:
+    """Starts queued monitors one at a time, highest-priority category first."""
+
+    def __init__(self, start: Callable[[int], Awaitable[None]], config: StartupConfig) -> None:
+        self._start = start
+        self._config = config
+        self._pending: dict[int, tuple[int, int]] = {}
+        self._sequence = 0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, streams: Iterable[Stream]) -> None:
+        for stream in streams:
+            if stream.id in self._pending:
+                continue
+            self._pending[stream.id] = (self._priority(stream.category), self._sequence)
+            self._sequence += 1
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self, stream_id: int) -> None:
+        self._pending.pop(stream_id, None)
+
+    async def _run(self) -> None:
+        while self._pending:
+            stream_id = min(self._pending, key=self._pending.__getitem__)
+            del self._pending[stream_id]
+            try:
+                await self._start(stream_id)
+            except Exception:
+                logger.exception("Failed to start monitor for stream %s", stream_id)
+            if self._pending:
+                await asyncio.sleep(self._config.start_interval)
+
+    def _priority(self, category: str) -> int:
+        try:
+            return self._config.category_priority.index(category)
+        except ValueError:
+            return len(self._config.category_priority)
+
+
 class NominatimGeocoder:
     def __init__(self) -> None:
         self._cache: dict[str, dict[str, Any] | None] = {}
@@ -102,27 +168,50 @@ class NominatimGeocoder:
 
 
 class MonitorManager:
-    def __init__(self, websocket_manager: WebSocketManager) -> None:
+    def __init__(self, websocket_manager: WebSocketManager, archive: ClipArchive) -> None:
         self._websocket_manager = websocket_manager
+        self._archive = archive
         self._active_tasks: dict[int, asyncio.Task] = {}
         self._config = TranscriberConfig.from_env()
         self._geocoder = NominatimGeocoder()
+        self._dedup_config = DedupConfig.from_env()
+        self._dedup = SegmentDeduplicator(self._dedup_config)
+        self._scheduler = StartupScheduler(self.start, StartupConfig.from_env())
+        self._runtime_check: asyncio.Task[str | None] | None = None
 
     def is_active(self, stream_id: int) -> bool:
         return stream_id in self._active_tasks
 
-    def start(self, stream_id: int) -> None:
+    def status(self) -> dict[str, int]:
+        return {"active": len(self._active_tasks), "pending": self._scheduler.pending}
+
+    def schedule(self, streams: Iterable[Stream]) -> None:
+        """Queue monitors to be ramped up at the configured startup rate."""
+        self._scheduler.schedule(streams)
+
+    async def start(self, stream_id: int) -> None:
+        self._scheduler.cancel(stream_id)
+        if stream_id in self._active_tasks:
+            return
+        await store.update_stream_status(stream_id, "active")
         if stream_id in self._active_tasks:
             return
-        storage.update_stream_status(stream_id, "active")
         task = asyncio.create_task(self._run_monitor(stream_id))
         self._active_tasks[stream_id] = task
+        task.add_done_callback(lambda done: self._forget_task(stream_id, done))
+
+    def _forget_task(self, stream_id: int, task: asyncio.Task) -> None:
+        # Monitors that exit on their own (e.g. a failed runtime check) must
+        # not keep counting as active.
+        if self._active_tasks.get(stream_id) is task:
+            del self._active_tasks[stream_id]
 
-    def stop(self, stream_id: int) -> None:
+    async def stop(self, stream_id: int) -> None:
+        self._scheduler.cancel(stream_id)
         task = self._active_tasks.pop(stream_id, None)
         if task:
             task.cancel()
-        storage.update_stream_status(stream_id, "inactive")
+        await store.update_stream_status(stream_id, "inactive")
 
     async def _run_monitor(self, stream_id: int) -> None:
         try:
@@ -130,7 +219,7 @@ class MonitorManager:
             with tempfile.TemporaryDirectory(prefix=f"stream_{stream_id}_") as tempdir:
                 temp_path = Path(tempdir)
                 while True:
-                    stream = await asyncio.to_thread(storage.get_stream, stream_id)
+                    stream = await store.get_stream(stream_id)
                     if not stream:
                         await asyncio.sleep(1.0)
                         continue
@@ -139,55 +228,122 @@ class MonitorManager:
             return
 
     async def _validate_runtime(self, stream_id: int) -> None:
+        # The binaries do not change while the process runs, so every monitor
+        # shares a single check.
+        if self._runtime_check is None:
+            self._runtime_check = asyncio.create_task(asyncio.to_thread(self._check_runtime))
+        error = await asyncio.shield(self._runtime_check)
+        if error:
+            await store.update_stream_status(stream_id, "error")
+            raise RuntimeError(error)
+
+    def _check_runtime(self) -> str | None:
         if not self._config.whisper_bin.exists():
-            await asyncio.to_thread(storage.update_stream_status, stream_id, "error")
-            raise RuntimeError(f"Missing whisper-cli at {self._config.whisper_bin}")
+            return f"Missing whisper-cli at {self._config.whisper_bin}"
         if not self._config.whisper_model.exists():
-            await asyncio.to_thread(storage.update_stream_status, stream_id, "error")
-            raise RuntimeError(f"Missing Whisper model at {self._config.whisper_model}")
+            return f"Missing Whisper model at {self._config.whisper_model}"
         if not shutil.which(self._config.ffmpeg_bin):
-            await asyncio.to_thread(storage.update_stream_status, stream_id, "error")
-            raise RuntimeError(f"Missing ffmpeg at {self._config.ffmpeg_bin}")
+            return f"Missing ffmpeg at {self._config.ffmpeg_bin}"
+        return None
 
     async def _process_segment(self, stream, temp_path: Path) -> None:
         segment_path = temp_path / f"segment_{int(time.time())}.wav"
         ok = await asyncio.to_thread(self._capture_segment, stream.url, segment_path)
         if not ok:
-            await asyncio.to_thread(storage.update_stream_status, stream.id, "error")
+            await store.update_stream_status(stream.id, "error")
             await asyncio.sleep(2.0)
             return
 
+        fingerprint = None
+        if self._dedup.enabled:
+            fingerprint = await asyncio.to_thread(fingerprint_wav, segment_path)
+        if fingerprint is not None:
+            original = await self._dedup.match_audio(stream.id, fingerprint)
+            if original is not None:
+                # Another stream carries the same audio; reuse its transcript
+                # instead of running whisper again. If it is still pending past
+                # the wait, fall through and transcribe this copy ourselves.
+                with contextlib.suppress(asyncio.TimeoutError):
+                    source = await asyncio.wait_for(
+                        asyncio.shield(original), self._dedup_config.wait_seconds
+                    )
+                    if source is not None:
+                        await self._store_duplicate(stream, source)
+                    return
+
+        result = self._dedup.register_audio(stream.id, fingerprint) if fingerprint is not None else None
+        transcription = None
+        try:
+            transcription = await self._transcribe_and_store(stream, segment_path)
+        finally:
+            if result is not None and not result.done():
+                result.set_result(transcription)
+
+    async def _transcribe_and_store(self, stream, segment_path: Path) -> Transcription | None:
         text = await asyncio.to_thread(self._transcribe_segment, segment_path)
         if not text or len(text.strip()) < self._config.min_text_chars:
-            return
-
-        location = await asyncio.to_thread(self._resolve_location, text, stream.city)
-        transcription = await asyncio.to_thread(
-            storage.create_transcription,
+            return None
+        text = text.strip()
+
+        signature = self._dedup.text_signature(text) if self._dedup.enabled else None
+        source = self._dedup.match_text(stream.id, signature) if signature is not None else None
+        if source is not None and self._dedup.suppress:
+            return source
+        # A text-only match does not prove both streams carry the same channel,
+        # so keep this stream's own transcript and location and only link it.
+
+        location, clip = await asyncio.gather(
+            asyncio.to_thread(self._resolve_location, text, stream.city),
+            self._archive_segment(stream.id, segment_path),
+        )
+        transcription = await store.create_transcription(
             TranscriptionCreate(
                 stream_id=stream.id,
-                content=text.strip(),
+                content=text,
                 confidence=None,
                 call_type=self._call_type_for_stream(stream.category),
                 latitude=location.get("latitude") if location else None,
                 longitude=location.get("longitude") if location else None,
                 address=location.get("address") if location else None,
+                audio_path=clip.path if clip else None,
+                audio_offset=clip.offset if clip else None,
+                audio_length=clip.length if clip else None,
+                duplicate_of=(source.duplicate_of or source.id) if source else None,
             ),
         )
+        if signature is not None and source is None:
+            self._dedup.register_text(signature, transcription)
+
+        await self._websocket_manager.publish(transcription)
+        return transcription
 
-        await self._websocket_manager.broadcast(
-            {
-                "type": "transcription",
-                "payload": {
-                    "streamId": transcription.stream_id,
-                    "content": transcription.content,
-                    "timestamp": transcription.timestamp.isoformat(),
-                    "latitude": transcription.latitude,
-                    "longitude": transcription.longitude,
-                    "address": transcription.address,
-                    "callType": transcription.call_type,
-                },
-            }
+    async def _store_duplicate(self, stream, source: Transcription) -> Transcription:
+        """Link (or with DEDUP_ACTION=suppress, drop) a copy of audio another stream transcribed."""
+        if self._dedup.suppress:
+            return source
+        duplicate = await store.create_transcription(
+            TranscriptionCreate(
+                stream_id=stream.id,
+                content=source.content,
+                confidence=source.confidence,
+                call_type=self._call_type_for_stream(stream.category),
+                latitude=source.latitude,
+                longitude=source.longitude,
+                address=source.address,
+                duplicate_of=source.duplicate_of or source.id,
+                audio_path=source.audio_path,
+                audio_offset=source.audio_offset,
+                audio_length=source.audio_length,
+            ),
+        )
+        await self._websocket_manager.publish(duplicate)
+        return duplicate
+
+    async def _archive_segment(self, stream_id: int, segment_path: Path) -> ClipLocation | None:
+        if not self._archive.enabled:
+            return None
+        return await asyncio.to_thread(
+            self._archive.store, self._config.ffmpeg_bin, stream_id, segment_path
         )
 
     def _capture_segment(self, stream_url: str, output_path: Path) -> bool:
@@ -0,0 +1,176 @@
+"""Time-bucketed activity counters maintained alongside ``transcriptions``.
+
+Rebuild the table from history with::
+
+    python -m python_app.rollups backfill --chunk-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .db import Base, SessionLocal, engine, upgrade_schema
+from .models import ActivityRollup, Stream, Transcription
+
+
+GRANULARITIES = ("minute", "hour", "day")
+DEFAULT_WINDOWS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=1),
+    "day": timedelta(days=30),
+}
+UNKNOWN_CALL_TYPE = "Unknown"
+# Keeps multi-row upserts under SQLite's bound-parameter limit.
+UPSERT_BATCH_SIZE = 500
+
+RollupKey = tuple[str, datetime, int, str, str]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity {granularity!r}")
+
+
+def rollup_counts(rows: Iterable[tuple[datetime, int, str | None, str | None]]) -> Counter[RollupKey]:
+    """Count ``(timestamp, stream_id, category, call_type)`` rows into every granularity."""
+    counts: Counter[RollupKey] = Counter()
+    for timestamp, stream_id, category, call_type in rows:
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                bucket_start(timestamp, granularity),
+                stream_id,
+                category or "",
+                call_type or UNKNOWN_CALL_TYPE,
+            )
+            counts[key] += 1
+    return counts
+
+
+def increment_statement(dialect_name: str, counts: Counter[RollupKey]):
+    """Upsert that adds ``counts`` onto the existing rollup rows."""
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise RuntimeError(f"Activity rollups are not supported on {dialect_name}")
+
+    statement = insert(ActivityRollup).values(
+        [
+            {
+                "granularity": granularity,
+                "bucket_start": start,
+                "stream_id": stream_id,
+                "category": category,
+                "call_type": call_type,
+                "count": count,
+            }
+            for (granularity, start, stream_id, category, call_type), count in counts.items()
+        ]
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["granularity", "bucket_start", "stream_id", "call_type"],
+        set_={"count": ActivityRollup.count + statement.excluded.count},
+    )
+
+
+def activity_query(
+    granularity: str,
+    since: datetime | None = None,
+    group_by: str | None = None,
+    stream_id: int | None = None,
+    category: str | None = None,
+):
+    """Select ``(bucket_start, key, count)`` rows, optionally split by a dimension."""
+    if since is None:
+        since = bucket_start(datetime.utcnow() - DEFAULT_WINDOWS[granularity], granularity)
+    elif since.tzinfo is not None:
+        # Buckets are stored as naive UTC.
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    dimensions = {
+        "stream": ActivityRollup.stream_id,
+        "category": ActivityRollup.category,
+        "callType": ActivityRollup.call_type,
+    }
+    key = dimensions[group_by] if group_by else None
+    columns = [ActivityRollup.bucket_start]
+    if key is not None:
+        columns.append(key)
+    query = (
+        select(*columns, func.sum(ActivityRollup.count))
+        .where(ActivityRollup.granularity == granularity, ActivityRollup.bucket_start >= since)
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+    if stream_id is not None:
+        query = query.where(ActivityRollup.stream_id == stream_id)
+    if category is not None:
+        query = query.where(ActivityRollup.category == category)
+    return query
+
+
+def backfill(chunk_size: int = 5000) -> int:
+    """Rebuild all rollups from ``transcriptions``, ``chunk_size`` rows at a time."""
+    with SessionLocal.begin() as session:
+        session.execute(delete(ActivityRollup))
+        last_id = session.execute(select(func.max(Transcription.id))).scalar() or 0
+
+    processed = 0
+    cursor = 0
+    while cursor < last_id:
+        with SessionLocal.begin() as session:
+            rows = session.execute(
+                select(
+                    Transcription.id,
+                    Transcription.timestamp,
+                    Transcription.stream_id,
+                    Stream.category,
+                    Transcription.call_type,
+                )
+                .outerjoin(Stream, Stream.id == Transcription.stream_id)
+                .where(Transcription.id > cursor, Transcription.id <= last_id)
+                .order_by(Transcription.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            counts = rollup_counts(row[1:] for row in rows)
+            dialect_name = session.get_bind().dialect.name
+            items = list(counts.items())
+            for start in range(0, len(items), UPSERT_BATCH_SIZE):
+                batch = Counter(dict(items[start : start + UPSERT_BATCH_SIZE]))
+                session.execute(increment_statement(dialect_name, batch))
+        cursor = rows[-1][0]
+        processed += len(rows)
+    return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain activity rollups.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subcommands.add_parser("backfill", help="Rebuild rollups from history")
+    backfill_parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        with engine.begin() as connection:
+            Base.metadata.create_all(connection)
+            upgrade_schema(connection)
+        processed = backfill(args.chunk_size)
+        print(f"Rebuilt activity rollups from {processed} transcriptions")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,11 +42,22 @@ class TranscriptionCreate(BaseModel):
     longitude: float | None = None
     address: str | None = None
     call_type: str | None = None
+    duplicate_of: int | None = None
+    audio_path: str | None = None
+    audio_offset: int | None = None
+    audio_length: int | None = None
 
 
 class TranscriptionOut(TranscriptionCreate):
     id: int
     timestamp: datetime
+    has_audio: bool = False
 
     class Config:
         from_attributes = True
+
+
+class ActivityBucketOut(BaseModel):
+    bucket: datetime
+    key: str | int | None = None
+    count: int
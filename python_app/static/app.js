@@ -126,6 +126,13 @@ function initStreamDetail() {
     const row = document.createElement("div");
     row.className = "log-entry";
     row.innerHTML = `<time>${formatTime(entry.timestamp)}</time><div>${entry.content}</div>`;
+    if (entry.hasAudio || entry.has_audio) {
+      const audio = document.createElement("audio");
+      audio.controls = true;
+      audio.preload = "none";
+      audio.src = `/api/transcriptions/${entry.id}/audio`;
+      row.appendChild(audio);
+    }
     if (prepend) {
       log.prepend(row);
     } else {
@@ -134,23 +141,86 @@ function initStreamDetail() {
     }
   };
 
-  jsonRequest(`/api/streams/${streamId}/transcriptions?limit=100`).then((items) => {
-    const ordered = items.slice().reverse();
-    ordered.forEach((entry) => renderEntry(entry, false));
-  });
+  // Resume cursor: the buffer epoch plus the sequence number of the last event
+  // received. Rendered transcriptions are tracked by id so replays and history
+  // reloads never show an entry twice.
+  let cursor = null;
+  const seen = new Set();
+  // Live entries that arrive while history is loading are held back and shown
+  // after it, so the log stays in order and nothing is wiped by the reload.
+  let pending = null;
+  let generation = 0;
 
-  const socketUrl = `${location.protocol === "https:" ? "wss" : "ws"}://${location.host}/ws`;
-  const socket = new WebSocket(socketUrl);
-  socket.onmessage = (event) => {
-    try {
-      const message = JSON.parse(event.data);
-      if (message.type === "transcription" && message.payload.streamId == streamId) {
-        renderEntry(message.payload, false);
-      }
-    } catch (err) {
-      console.warn("ws parse error", err);
+  const show = (entry) => {
+    if (seen.has(entry.id)) {
+      return;
     }
+    seen.add(entry.id);
+    renderEntry(entry, false);
+  };
+
+  // History is only loaded once the server has handed out a cursor, so every
+  // event after the snapshot is delivered by the socket.
+  const loadHistory = () => {
+    const current = ++generation;
+    pending = [];
+    return jsonRequest(`/api/streams/${streamId}/transcriptions?limit=100`)
+      .then((items) => {
+        if (current !== generation) {
+          return;
+        }
+        qsa(".log-entry", log).forEach((row) => row.remove());
+        seen.clear();
+        items.slice().reverse().forEach(show);
+      })
+      .catch((err) => console.warn("history load failed", err))
+      .finally(() => {
+        if (current !== generation) {
+          return;
+        }
+        const queued = pending;
+        pending = null;
+        queued.forEach(show);
+      });
   };
+
+  const connect = () => {
+    const base = `${location.protocol === "https:" ? "wss" : "ws"}://${location.host}/ws`;
+    const socketUrl =
+      cursor == null
+        ? base
+        : `${base}?epoch=${encodeURIComponent(cursor.epoch)}&since=${cursor.id}`;
+    const socket = new WebSocket(socketUrl);
+    socket.onmessage = (event) => {
+      try {
+        const message = JSON.parse(event.data);
+        if (message.type === "hello" || message.type === "resync") {
+          cursor = { epoch: message.epoch, id: message.id };
+          loadHistory();
+          return;
+        }
+        if (message.type !== "transcription") {
+          return;
+        }
+        cursor = { epoch: message.epoch, id: message.id };
+        if (message.payload.streamId != streamId) {
+          return;
+        }
+        if (pending) {
+          pending.push(message.payload);
+        } else {
+          show(message.payload);
+        }
+      } catch (err) {
+        console.warn("ws parse error", err);
+      }
+    };
+    socket.onclose = () => {
+      setTimeout(connect, 1000 + Math.random() * 4000);
+    };
+  };
+
+  connect();
 }
 
 function initMap() {
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from datetime import datetime
 
 from sqlalchemy import delete, desc, select, update
 
 from .db import SessionLocal
-from .models import Stream, Transcription
+from .models import ActivityRollup, Stream, Transcription
+from .rollups import activity_query, increment_statement, rollup_counts
 from .schemas import StreamCreate, StreamStatusUpdate, TranscriptionCreate
 
 
@@ -66,6 +68,9 @@ def delete_stream(stream_id: int) -> None:
         session.execute(
             delete(Transcription).where(Transcription.stream_id == stream_id)
         )
+        session.execute(
+            delete(ActivityRollup).where(ActivityRollup.stream_id == stream_id)
+        )
         stream = session.get(Stream, stream_id)
         if stream:
             session.delete(stream)
@@ -85,6 +90,14 @@ def get_transcriptions(stream_id: int, limit: int = 50) -> list[Transcription]:
         return items
 
 
+def get_transcription(transcription_id: int) -> Transcription | None:
+    with session_scope() as session:
+        transcription = session.get(Transcription, transcription_id)
+        if transcription:
+            session.expunge(transcription)
+        return transcription
+
+
 def get_all_transcriptions(limit: int = 100, with_location: bool = False) -> list[Transcription]:
     with session_scope() as session:
         query = select(Transcription).order_by(desc(Transcription.timestamp)).limit(limit)
@@ -106,5 +119,25 @@ def create_transcription(payload: TranscriptionCreate) -> Transcription:
         session.add(transcription)
         session.flush()
         session.refresh(transcription)
+        stream = session.get(Stream, transcription.stream_id)
+        category = stream.category if stream else None
+        counts = rollup_counts(
+            [(transcription.timestamp, transcription.stream_id, category, transcription.call_type)]
+        )
+        session.execute(increment_statement(session.get_bind().dialect.name, counts))
         session.expunge(transcription)
         return transcription
+
+
+def get_activity(
+    granularity: str,
+    since: datetime | None = None,
+    group_by: str | None = None,
+    stream_id: int | None = None,
+    category: str | None = None,
+) -> list[tuple]:
+    with session_scope() as session:
+        result = session.execute(
+            activity_query(granularity, since, group_by, stream_id, category)
+        )
+        return [tuple(row) for row in result]
@@ -0,0 +1,62 @@
+"""Async storage interface used by the app.
+
+``DATABASE_ASYNC=true`` selects the native asyncio backend in
+``async_storage``; otherwise the synchronous ``storage`` functions run on the
+default thread pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from functools import wraps
+
+from . import storage
+from .db import DATABASE_ASYNC, Base, engine, upgrade_schema
+
+
+def _threaded(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+if DATABASE_ASYNC:
+    from .async_storage import (
+        create_stream,
+        create_transcription,
+        delete_stream,
+        dispose,
+        get_activity,
+        get_all_transcriptions,
+        get_stream,
+        get_streams,
+        get_transcription,
+        get_transcriptions,
+        init_models,
+        update_stream_status,
+    )
+else:
+
+    def _init_models() -> None:
+        with engine.begin() as connection:
+            Base.metadata.create_all(connection)
+            upgrade_schema(connection)
+
+    async def init_models() -> None:
+        await asyncio.to_thread(_init_models)
+
+    async def dispose() -> None:
+        return None
+
+    create_stream = _threaded(storage.create_stream)
+    create_transcription = _threaded(storage.create_transcription)
+    delete_stream = _threaded(storage.delete_stream)
+    get_activity = _threaded(storage.get_activity)
+    get_all_transcriptions = _threaded(storage.get_all_transcriptions)
+    get_stream = _threaded(storage.get_stream)
+    get_streams = _threaded(storage.get_streams)
+    get_transcription = _threaded(storage.get_transcription)
+    get_transcriptions = _threaded(storage.get_transcriptions)
+    update_stream_status = _threaded(storage.update_stream_status)
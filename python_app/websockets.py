@@ -1,25 +1,107 @@
 from __future__ import annotations
 
+import asyncio
+
 from fastapi import WebSocket
 
+from .archive import ClipArchive
+from .events import TranscriptionBuffer, transcription_event
+from .models import Transcription
+
+
+# Events a client may fall behind by before it is dropped; it then reconnects
+# with its cursor and catches up from the buffer.
+SEND_QUEUE_SIZE = 256
+SEND_TIMEOUT = 10.0
+
 
 class WebSocketManager:
-    def __init__(self) -> None:
-        self._connections: set[WebSocket] = set()
+    def __init__(self, buffer: TranscriptionBuffer, archive: ClipArchive) -> None:
+        self._buffer = buffer
+        self._archive = archive
+        # Each registered socket has its own queue drained by a sender task, so
+        # publishing never waits on a client.
+        self._connections: dict[WebSocket, asyncio.Queue[dict]] = {}
+        self._senders: dict[WebSocket, asyncio.Task] = {}
 
-    async def connect(self, websocket: WebSocket) -> None:
+    async def connect(
+        self,
+        websocket: WebSocket,
+        epoch: str | None = None,
+        since: int | None = None,
+    ) -> None:
         await websocket.accept()
-        self._connections.add(websocket)
+        if since is None:
+            # Hand fresh clients a cursor up front so they can resume even if
+            # they drop before seeing an event; anything published while the
+            # hello is in flight is picked up by the replay below.
+            epoch, since = self._buffer.epoch, self._buffer.last_sequence
+            await websocket.send_json({"type": "hello", "epoch": epoch, "id": since})
+        await self._replay(websocket, epoch, since)
+        queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self._connections[websocket] = queue
+        self._senders[websocket] = asyncio.create_task(self._send_loop(websocket, queue))
+
+    async def _replay(self, websocket: WebSocket, epoch: str | None, since: int) -> None:
+        # Keep draining until the buffer has nothing newer; the socket is only
+        # registered after the final (await-free) check so no event is skipped.
+        cursor = since
+        while True:
+            pending = self._buffer.since(epoch, cursor)
+            if pending is None:
+                # Restart the client from the current position; it reloads
+                # history over REST and then receives everything after it.
+                epoch, cursor = self._buffer.epoch, self._buffer.last_sequence
+                await websocket.send_json({"type": "resync", "epoch": epoch, "id": cursor})
+                continue
+            if not pending:
+                return
+            for sequence, item in pending:
+                await websocket.send_json(self._event(sequence, item))
+                cursor = sequence
+
+    async def _send_loop(self, websocket: WebSocket, queue: asyncio.Queue[dict]) -> None:
+        try:
+            while True:
+                payload = await queue.get()
+                await asyncio.wait_for(websocket.send_json(payload), SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._drop(websocket)
 
     def disconnect(self, websocket: WebSocket) -> None:
-        self._connections.discard(websocket)
+        self._connections.pop(websocket, None)
+        sender = self._senders.pop(websocket, None)
+        if sender is not None and sender is not asyncio.current_task():
+            sender.cancel()
+
+    def _drop(self, websocket: WebSocket) -> None:
+        """Unregister a socket that cannot keep up and close it."""
+        self.disconnect(websocket)
+        asyncio.get_running_loop().create_task(self._close(websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def publish(self, transcription: Transcription) -> None:
+        # Appending and enqueueing happen without an await in between, so
+        # every queue receives events in sequence order.
+        sequence = self._buffer.append(transcription)
+        await self.broadcast(self._event(sequence, transcription))
+
+    def _event(self, sequence: int, transcription: Transcription) -> dict:
+        # Checked at send time so replayed events stop offering expired clips.
+        has_audio = self._archive.has_clip(transcription.audio_path)
+        return transcription_event(self._buffer.epoch, sequence, transcription, has_audio)
 
     async def broadcast(self, payload: dict) -> None:
-        dead: list[WebSocket] = []
-        for socket in self._connections:
+        for socket, queue in list(self._connections.items()):
             try:
-                await socket.send_json(payload)
-            except Exception:
-                dead.append(socket)
-        for socket in dead:
-            self._connections.discard(socket)
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop(socket)
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from python_app.db import Base
+from python_app.models import ActivityRollup
+from python_app.rollups import activity_query
+
+
+def test_activity_query_normalises_offset_since():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2026, 1, 29, 20)
+    with Session(engine) as session:
+        session.add_all(
+            ActivityRollup(
+                granularity="hour",
+                bucket_start=start + timedelta(hours=hour),
+                stream_id=1,
+                category="Police",
+                call_type="Dispatch",
+                count=1,
+            )
+            for hour in range(8)
+        )
+        session.commit()
+
+        def buckets(since):
+            return [row[0] for row in session.execute(activity_query("hour", since=since))]
+
+        utc = buckets(datetime(2026, 1, 30, 0, tzinfo=timezone.utc))
+        offset = buckets(datetime(2026, 1, 30, 5, tzinfo=timezone(timedelta(hours=5))))
+        assert utc == [start + timedelta(hours=hour) for hour in range(4, 8)]
+        assert offset == utc